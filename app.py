@@ -1,37 +1,108 @@
 ########################
 # app.py  –  Streamlit #
 ########################
+import contextlib
+import os
+import tempfile
+from pathlib import Path
+
 import streamlit as st
 import pandas as pd
-import altair as alt
+import pyarrow as pa
 import us                        # make sure "us" is in requirements.txt
 
-# ---------- PAGE CONFIG & ALTAIR OPTIONS ----------
+from charts import build_dashboard
+
+# ---------- PAGE CONFIG ----------
 st.set_page_config(
     page_title="University Donor Dashboard",
     layout="wide",
 )
-alt.data_transformers.disable_max_rows()  # avoid row‑limit warnings
-
-# ---------- LOAD DATA ----------
-@st.cache_data(show_spinner=False)
-def load_data(csv_path: str) -> pd.DataFrame:
-    df0 = pd.read_csv(csv_path)
 
-    # Map state abbreviations → FIPS codes → names
+# ---------- STATE LOOKUPS ----------
+@st.cache_resource
+def state_maps() -> tuple[dict, dict]:
+    # Static reference data – built once per process, not on every rerun
     state_id_map   = {s.abbr: int(s.fips) for s in us.states.STATES}
     state_name_map = {int(s.fips): s.name for s in us.states.STATES}
+    return state_id_map, state_name_map
+
+# ---------- LOAD DATA ----------
+PARQUET_SCHEMA = 3                       # bump whenever load_data's output changes
 
+@st.cache_data(show_spinner=False)
+def load_data(csv_path: str) -> tuple[pd.DataFrame, dict]:
+    # Map state abbreviations → FIPS codes → names
+    state_id_map, state_name_map = state_maps()
+
+    # Cleaned copy written next to the CSV; reused while it is newer.
+    # The schema version is in the name, so older layouts are never read
+    parquet_path = Path(csv_path).with_suffix(f".v{PARQUET_SCHEMA}.parquet")
+    if (
+        parquet_path.exists()
+        and parquet_path.stat().st_mtime >= Path(csv_path).stat().st_mtime
+    ):
+        try:
+            df0 = pd.read_parquet(parquet_path, engine="pyarrow")
+        except (OSError, pa.ArrowException):
+            # Torn or corrupt copy – drop it and rebuild from the CSV below
+            with contextlib.suppress(OSError):
+                parquet_path.unlink()
+        else:
+            # Parquet only round‑trips string dictionaries – re‑wrap the FIPS codes
+            df0["state_fips"] = df0["state_fips"].astype("Int8").astype("category")
+            return df0, state_name_map
+
+    df0 = pd.read_csv(
+        csv_path,
+        engine="pyarrow",                # multithreaded Arrow reader
+        dtype={
+            "College"               : "category",
+            "State"                 : "category",
+            "Gift Allocation"       : "category",
+            "Allocation Subcategory": "category",
+            "City"                  : "string[pyarrow]",   # no per‑cell PyObjects
+            "Major"                 : "string[pyarrow]",
+        },
+        parse_dates=["Gift Date"],
+        date_format="%m/%d/%y",          # e.g. 7/28/10 – skips dateutil guessing
+    )
+    # Parquet can't store second resolution – pin ns so both load paths match
+    df0["Gift Date"] = df0["Gift Date"].astype("datetime64[ns]")
+
+    # Relabel the State categories in place – the per‑row codes are reused,
+    # so no dict lookup runs per row; unmapped (e.g. DC) stay <NA>.
+    # Ordered by FIPS code so this matches the Parquet path's astype("category")
+    states = df0["State"].cat.categories
+    known  = states[states.isin(list(state_id_map))]
+    known  = known[known.map(state_id_map).argsort()]
     df0["state_fips"] = (
         df0["State"]
-           .map(state_id_map)
-           .dropna()
-           .astype(int)
+           .cat.set_categories(known)
+           .cat.rename_categories(pd.array(known.map(state_id_map), dtype="Int8"))
     )
 
     # Add Gift Year if missing
     if "Gift Year" not in df0.columns:
-        df0["Gift Year"] = pd.to_datetime(df0["Gift Date"]).dt.year.astype(str)
+        df0["Gift Year"] = df0["Gift Date"].dt.year
+
+    # Years fit in int16; Gift Amount stays float64 so totals are exact
+    df0["Gift Year"] = df0["Gift Year"].astype("int16")
+
+    # Write beside the target and swap it in, so a crash never leaves a torn file
+    tmp_path = None
+    try:
+        fd, tmp_path = tempfile.mkstemp(
+            dir=parquet_path.parent, prefix=f"{parquet_path.stem}.", suffix=".parquet.tmp"
+        )
+        os.close(fd)
+        df0.to_parquet(tmp_path, engine="pyarrow", compression="zstd")
+        os.replace(tmp_path, parquet_path)
+    except OSError:
+        # Read‑only checkout or full disk – just skip the cache
+        if tmp_path is not None:
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
 
     return df0, state_name_map
 
@@ -39,86 +110,73 @@ def load_data(csv_path: str) -> pd.DataFrame:
 df, state_name_map = load_data("university-donations.csv")
 
 # ---------- (OPTIONAL) STATE‑LEVEL AGGREGATE ----------
-state_agg = (
-    df.groupby("state_fips")
-      .agg(
-          **{
-              "Total Donations": ("Gift Amount", "sum"),
-              "Unique Donors" : ("Prospect ID", "nunique"),
-          }
-      )
-      .reset_index()
-)
-state_agg["State Name"] = state_agg["state_fips"].map(state_name_map)
-
-# ---------- SELECTIONS ----------
-selection_alloc = alt.selection_point(fields=["Gift Allocation"], name="SelectAlloc")
-brush_year      = alt.selection_interval(encodings=["x"], name="BrushYear")
-reset_click     = alt.selection_point(on="click", clear="mouseup", name="ResetClick")
-
-# ---------- CHARTS ----------
-bar_alloc = (
-    alt.Chart(df)
-        .mark_bar()
-        .encode(
-            y=alt.Y("Gift Allocation:N", sort="-x"),
-            x=alt.X("sum(Gift Amount):Q", title="Total Gift Amount ($)"),
-            color=alt.condition(selection_alloc, "Gift Allocation:N", alt.value("lightgray")),
-            tooltip=[
-                "Gift Allocation:N",
-                alt.Tooltip("sum(Gift Amount):Q", format="$,.0f"),
-            ],
-        )
-        .add_selection(selection_alloc)
-        .properties(width=350, height=220, title="Total Gift Amount by Allocation")
-)
+@st.cache_data(show_spinner=False)
+def state_totals(csv_path: str) -> pd.DataFrame:
+    # Keyed on the path only, so reruns are a cache lookup, not a groupby
+    df0, state_name_map = load_data(csv_path)
+    agg = (
+        df0.groupby("state_fips", observed=True)
+           .agg(
+               **{
+                   "Total Donations": ("Gift Amount", "sum"),
+                   "Unique Donors" : ("Prospect ID", "nunique"),
+               }
+           )
+           .reset_index()
+    )
+    agg["State Name"] = agg["state_fips"].map(state_name_map)
+    return agg
 
-line_year = (
-    alt.Chart(df)
-        .mark_line(point=True)
-        .encode(
-            x=alt.X("Gift Year:O", sort="ascending", title="Year"),
-            y=alt.Y("sum(Gift Amount):Q", title="Total Gift Amount ($)"),
-            color="Gift Allocation:N",
-            tooltip=[
-                alt.Tooltip("Gift Year:O", title="Year"),
-                "Gift Allocation:N",
-                alt.Tooltip("sum(Gift Amount):Q", format="$,.0f", title="Total Gift Amount"),
-            ],
-        )
-        .add_selection(brush_year, selection_alloc)
-        .transform_filter(selection_alloc)
-        .properties(width=500, height=220, title="Donations Over Time by Allocation")
-)
+state_agg = state_totals("university-donations.csv")
 
-bar_subcat = (
-    alt.Chart(df)
-        .mark_bar()
-        .encode(
-            y=alt.Y("Allocation Subcategory:N", sort="-x"),
-            x=alt.X("sum(Gift Amount):Q", title="Total Gift Amount ($)"),
-            color="Gift Allocation:N",
-            tooltip=[
-                "Allocation Subcategory:N",
-                alt.Tooltip("sum(Gift Amount):Q", format="$,.0f"),
-            ],
-        )
-        .add_selection(selection_alloc, brush_year)
-        .transform_filter(selection_alloc)
-        .transform_filter(brush_year)
-        .properties(width=850, height=300, title="Breakdown by Allocation Subcategory")
-)
+# ---------- CHART AGGREGATES ----------
+@st.cache_data(show_spinner=False)
+def chart_frames(csv_path: str) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    # Summed in pandas so the specs embed a few hundred rows, not every gift
+    df0, _ = load_data(csv_path)
+    # One pass over the gifts; the coarser frames roll up from this cube.
+    # Keep Year + Allocation so the brush and click selections still filter
+    by_sub = (
+        df0.groupby(
+               ["Gift Year", "Gift Allocation", "Allocation Subcategory"],
+               observed=True, as_index=False,
+           )
+           ["Gift Amount"].sum()
+    )
+    by_year = (
+        by_sub.groupby(["Gift Year", "Gift Allocation"], observed=True, as_index=False)
+              ["Gift Amount"].sum()
+    )
+    by_alloc = (
+        by_year.groupby("Gift Allocation", observed=True, as_index=False)
+               ["Gift Amount"].sum()
+    )
+    return by_alloc, by_year, by_sub
 
-# ---------- LAYOUT ----------
-dashboard = alt.vconcat(
-    alt.hconcat(bar_alloc, line_year).resolve_scale(color="independent"),
-    bar_subcat,
-    spacing=15,
-)
+# ---------- DASHBOARD SPEC ----------
+@st.cache_data(show_spinner=False)
+def dashboard_spec(csv_path: str) -> dict:
+    # Altair builds the spec once; reruns reuse the plain dict.
+    # One to_dict for the whole layout, skipping the JSON‑schema walk
+    by_alloc, by_year, by_sub = chart_frames(csv_path)
+    return build_dashboard(by_alloc, by_year, by_sub).to_dict(validate=False)
 
-st.altair_chart(dashboard, use_container_width=True)
+st.vega_lite_chart(dashboard_spec("university-donations.csv"), use_container_width=True)
 
 # ---------- SIDEBAR ----------
+RAW_PAGE_ROWS = 1000                     # rows sent to the browser per page
+
+@st.fragment
+def raw_data_panel(df0: pd.DataFrame) -> None:
+    # Toggling reruns only this fragment, not the dashboard above it
+    if st.checkbox("Show raw data"):
+        n_pages = max(1, -(-len(df0) // RAW_PAGE_ROWS))
+        page    = st.number_input("Page", min_value=1, max_value=n_pages, value=1, step=1)
+        start   = (page - 1) * RAW_PAGE_ROWS
+        stop    = min(start + RAW_PAGE_ROWS, len(df0))
+        st.dataframe(df0.iloc[start:stop])
+        st.caption(f"Rows {start + 1:,}–{stop:,} of {len(df0):,}")
+
 with st.sidebar:
     st.header("About")
     st.markdown(
@@ -130,8 +188,7 @@ with st.sidebar:
         * All charts update together.
         """
     )
-    if st.checkbox("Show raw data"):
-        st.dataframe(df)
+    raw_data_panel(df)
 
 
 
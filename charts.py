@@ -0,0 +1,98 @@
+##########################
+# charts.py  –  Altair   #
+##########################
+# Pure chart builders: aggregated frames in, Altair charts out.
+# No Streamlit calls here, so they can be profiled / tested directly.
+import altair as alt
+import pandas as pd
+
+
+# ---------- SELECTIONS ----------
+def build_selections() -> tuple[alt.Parameter, alt.Parameter]:
+    selection_alloc = alt.selection_point(fields=["Gift Allocation"], name="SelectAlloc")
+    brush_year      = alt.selection_interval(encodings=["x"], name="BrushYear")
+    return selection_alloc, brush_year
+
+
+# ---------- CHARTS ----------
+def build_alloc_bar(by_alloc: pd.DataFrame, selection_alloc: alt.Parameter) -> alt.Chart:
+    return (
+        alt.Chart(by_alloc)
+            .mark_bar()
+            .encode(
+                y=alt.Y("Gift Allocation:N", sort="-x"),
+                x=alt.X("Gift Amount:Q", title="Total Gift Amount ($)"),
+                color=alt.condition(selection_alloc, "Gift Allocation:N", alt.value("lightgray")),
+                tooltip=[
+                    "Gift Allocation:N",
+                    alt.Tooltip("Gift Amount:Q", format="$,.0f", title="Total Gift Amount"),
+                ],
+            )
+            .add_selection(selection_alloc)
+            .properties(width=350, height=220, title="Total Gift Amount by Allocation")
+    )
+
+
+def build_year_line(
+    by_year: pd.DataFrame,
+    selection_alloc: alt.Parameter,
+    brush_year: alt.Parameter,
+) -> alt.Chart:
+    return (
+        alt.Chart(by_year)
+            .mark_line(point=True)
+            .encode(
+                x=alt.X("Gift Year:O", sort="ascending", title="Year"),
+                y=alt.Y("Gift Amount:Q", title="Total Gift Amount ($)"),
+                color="Gift Allocation:N",
+                tooltip=[
+                    alt.Tooltip("Gift Year:O", title="Year"),
+                    "Gift Allocation:N",
+                    alt.Tooltip("Gift Amount:Q", format="$,.0f", title="Total Gift Amount"),
+                ],
+            )
+            .add_selection(brush_year, selection_alloc)
+            .transform_filter(selection_alloc)
+            .properties(width=500, height=220, title="Donations Over Time by Allocation")
+    )
+
+
+def build_subcat_bar(
+    by_sub: pd.DataFrame,
+    selection_alloc: alt.Parameter,
+    brush_year: alt.Parameter,
+) -> alt.Chart:
+    return (
+        alt.Chart(by_sub)
+            .mark_bar()
+            .encode(
+                y=alt.Y("Allocation Subcategory:N", sort="-x"),
+                x=alt.X("sum(Gift Amount):Q", title="Total Gift Amount ($)"),
+                color="Gift Allocation:N",
+                tooltip=[
+                    "Allocation Subcategory:N",
+                    alt.Tooltip("sum(Gift Amount):Q", format="$,.0f"),
+                ],
+            )
+            .add_selection(selection_alloc, brush_year)
+            .transform_filter(selection_alloc)
+            .transform_filter(brush_year)
+            .properties(width=850, height=300, title="Breakdown by Allocation Subcategory")
+    )
+
+
+# ---------- LAYOUT ----------
+def build_dashboard(
+    by_alloc: pd.DataFrame,
+    by_year: pd.DataFrame,
+    by_sub: pd.DataFrame,
+) -> alt.VConcatChart:
+    selection_alloc, brush_year = build_selections()
+    return alt.vconcat(
+        alt.hconcat(
+            build_alloc_bar(by_alloc, selection_alloc),
+            build_year_line(by_year, selection_alloc, brush_year),
+        ).resolve_scale(color="independent"),
+        build_subcat_bar(by_sub, selection_alloc, brush_year),
+        spacing=15,
+    )